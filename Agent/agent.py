@@ -4,51 +4,122 @@ from agno.team.team import Team
 from agno.tools.duckduckgo import DuckDuckGoTools
 from agno.tools.reasoning import ReasoningTools
 from agno.models.openrouter import OpenRouter
+from functools import lru_cache
+from dotenv import load_dotenv
 import asyncio
+import os
+import threading
+import time
 
-# Agent 1: Scrape all Ghana news
-ghana_news_agent = Agent(
-    name="Ghana News Scraper Agent",
-    role="Scrape and aggregate all news articles from Ghana across multiple sources.",
-    model=OpenRouter(id="gpt-4.1", api_key="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"),
-    tools=[DuckDuckGoTools()],
-    instructions="You are an expert news aggregator. Your job is to scrape   all recent news articles from Ghana, across all topics. Always include sources and provide a concise detail for each article.",
-    add_datetime_to_instructions=True,
-)
-
-# Agent 2: Filter for developmental news for a specific place in Ghana
-place_dev_news_agent = Agent(
-    name="Ghana Developmental News Agent",
-    role="Filter and provide only developmental news for a specific place in Ghana as requested by the user.",
-    model=OpenRouter(id="gpt-4.1", api_key="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"),
-    tools=[DuckDuckGoTools()],
-    instructions="You are a specialized news agent. Your task is to extract all recent developmental news about a specific place in Ghana (e.g., Accra, Kumasi, Tamale). Always include sources and provide a concise summary and the nes should be recent."
-    "NOTE: The developmental news should include the following: Amenities(eg. schools, hospitals, roads, etc), Industries(eg. mining, agriculture, manufacturing, etc).",
-    add_datetime_to_instructions=True,
-)
-
-# Team: Coordinate Ghana news and developmental news agents
-ghana_dev_news_team = Team(
-    name="Ghana Developmental News Team",
-    mode="coordinate",
-    model=OpenRouter(id="gpt-4.1", api_key="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"),
-    members=[ghana_news_agent, place_dev_news_agent],
-    tools=[ReasoningTools(add_instructions=True)],
-    instructions=[
-        "Collaborate to provide comprehensive, up-to-date news coverage about Ghana, with a focus on developmental news (infrastructure, education, health, technology, etc.).",
-        "When a user requests news for a specific place, ensure the response is filtered for developmental topics relevant to that location.",
-        "Summarize news clearly, include sources, and present findings in a structured, easy-to-follow format.",
-        "Only output the final consolidated news , not individual agent responses.",
-    ],
-    markdown=True,
-    show_members_responses=True,
-    enable_agentic_context=True,
-    add_datetime_to_instructions=True,
-    success_criteria="The team has provided a complete, well-sourced summary of Ghanaian news with a clear focus on developmental topics, and has addressed any user-specified location requests.",
-)
+load_dotenv()
+
+OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY")
+
+class CachedDuckDuckGoTools(DuckDuckGoTools):
+    """DuckDuckGoTools with a TTL cache and in-flight deduplication.
+
+    Both team members often issue near-identical queries for one user
+    question; caching on the normalized query means the second member
+    (and any repeat within 10 minutes) costs zero network I/O.
+    """
+
+    CACHE_TTL = 600  # seconds
+    CACHE_MAX_ENTRIES = 1024
+
+    _cache: dict = {}
+    _in_flight: dict = {}
+    _lock = threading.Lock()
+
+    def _cached(self, name, fn, query, max_results):
+        key = (name, query.strip().casefold(), max_results)
+        while True:
+            with self._lock:
+                hit = self._cache.get(key)
+                if hit is not None:
+                    fetched_at, result = hit
+                    if time.monotonic() - fetched_at < self.CACHE_TTL:
+                        return result
+                    del self._cache[key]
+                event = self._in_flight.get(key)
+                if event is None:
+                    self._in_flight[key] = threading.Event()
+                    break
+            # Another call is fetching the same query - wait and re-check
+            event.wait()
+        try:
+            result = fn(query, max_results)
+            with self._lock:
+                self._cache[key] = (time.monotonic(), result)
+                while len(self._cache) > self.CACHE_MAX_ENTRIES:
+                    del self._cache[next(iter(self._cache))]
+            return result
+        finally:
+            with self._lock:
+                self._in_flight.pop(key).set()
+
+    def duckduckgo_search(self, query: str, max_results: int = 5) -> str:
+        return self._cached("search", super().duckduckgo_search, query, max_results)
+
+    def duckduckgo_news(self, query: str, max_results: int = 5) -> str:
+        return self._cached("news", super().duckduckgo_news, query, max_results)
+
+@lru_cache(maxsize=2)
+def get_team(verbose: bool = True) -> Team:
+    """Build the Ghana news team once per mode and reuse it everywhere.
+
+    The API and the CLI share these singletons so the process holds one
+    set of tool clients and model handles instead of one per import site.
+    The CLI keeps the verbose reasoning output; the API passes
+    verbose=False so no tokens are spent serializing member responses and
+    intermediate steps that would be thrown away anyway.
+    """
+    # One OpenRouter model instance shared by both members and the team
+    model = OpenRouter(id="gpt-4.1", api_key=OPENROUTER_API_KEY)
+
+    # Agent 1: Scrape all Ghana news
+    ghana_news_agent = Agent(
+        name="Ghana News Scraper Agent",
+        role="Scrape and aggregate all news articles from Ghana across multiple sources.",
+        model=model,
+        tools=[CachedDuckDuckGoTools()],
+        instructions="You are an expert news aggregator. Your job is to scrape   all recent news articles from Ghana, across all topics. Always include sources and provide a concise detail for each article.",
+        add_datetime_to_instructions=True,
+    )
+
+    # Agent 2: Filter for developmental news for a specific place in Ghana
+    place_dev_news_agent = Agent(
+        name="Ghana Developmental News Agent",
+        role="Filter and provide only developmental news for a specific place in Ghana as requested by the user.",
+        model=model,
+        tools=[CachedDuckDuckGoTools()],
+        instructions="You are a specialized news agent. Your task is to extract all recent developmental news about a specific place in Ghana (e.g., Accra, Kumasi, Tamale). Always include sources and provide a concise summary and the nes should be recent."
+        "NOTE: The developmental news should include the following: Amenities(eg. schools, hospitals, roads, etc), Industries(eg. mining, agriculture, manufacturing, etc).",
+        add_datetime_to_instructions=True,
+    )
+
+    # Team: Coordinate Ghana news and developmental news agents
+    return Team(
+        name="Ghana Developmental News Team",
+        mode="coordinate",
+        model=model,
+        members=[ghana_news_agent, place_dev_news_agent],
+        tools=[ReasoningTools(add_instructions=True)],
+        instructions=[
+            "Collaborate to provide comprehensive, up-to-date news coverage about Ghana, with a focus on developmental news (infrastructure, education, health, technology, etc.).",
+            "When a user requests news for a specific place, ensure the response is filtered for developmental topics relevant to that location.",
+            "Summarize news clearly, include sources, and present findings in a structured, easy-to-follow format.",
+            "Only output the final consolidated news , not individual agent responses.",
+        ],
+        markdown=True,
+        show_members_responses=verbose,
+        enable_agentic_context=verbose,
+        add_datetime_to_instructions=True,
+        success_criteria="The team has provided a complete, well-sourced summary of Ghanaian news with a clear focus on developmental topics, and has addressed any user-specified location requests.",
+    )
 
 if __name__ == "__main__":
     # Example: Get all developmental news for Accra
+    ghana_dev_news_team = get_team()
     while True:
         user_input = input("\n🏝️ You: ")
 
@@ -58,4 +129,3 @@ if __name__ == "__main__":
             show_full_reasoning=True,
             stream_intermediate_steps=True,
         )
-    
\ No newline at end of file
@@ -1,13 +1,39 @@
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pydantic import BaseModel
 from typing import Dict, Any
+import asyncio
+import json
+import os
+import time
+from collections import OrderedDict
 import uvicorn
-from agent import ghana_dev_news_team
+from agent import get_team
+
+# One shared team instance for every request in this process, built on
+# startup (once the event loop is ready) rather than at import time
+ghana_dev_news_team = None
+
+# In-process response cache for /news keyed by normalized place name.
+# Repeat queries within the TTL skip the whole agent team run, and concurrent
+# identical queries coalesce onto one in-flight run via _pending futures.
+CACHE_TTL = 300  # seconds
+CACHE_MAX_ENTRIES = 256
+_cache: "OrderedDict[str, tuple[float, str]]" = OrderedDict()
+_pending: Dict[str, asyncio.Future] = {}
+_cache_lock = asyncio.Lock()
+
+# Bound concurrent team runs so batch fan-out respects OpenRouter rate limits
+_team_semaphore = asyncio.Semaphore(8)
+
+# Cap batch fan-out so one request can't queue unbounded work
+BATCH_MAX_PLACES = 25
 
 app = FastAPI(
     title="TropiTrek Ghana Development News API",
     description="API for retrieving developmental news from Ghana for a specific place",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
 )
 
 class PlaceRequest(BaseModel):
@@ -16,29 +42,152 @@ class PlaceRequest(BaseModel):
 class NewsResponse(BaseModel):
     news: str
 
+class BatchPlaceRequest(BaseModel):
+    places: list[str]
+
+class BatchNewsResponse(BaseModel):
+    news: Dict[str, str]
+
+async def _fetch_news(place: str) -> str:
+    """Fetch news for one place through the cache and single-flight map"""
+    key = place.strip().casefold()
+
+    # Fast path: serve a fresh cached response for this place
+    async with _cache_lock:
+        cached = _cache.get(key)
+        if cached is not None:
+            timestamp, news = cached
+            if time.monotonic() - timestamp < CACHE_TTL:
+                _cache.move_to_end(key)
+                return news
+            del _cache[key]
+        pending = _pending.get(key)
+        if pending is None:
+            pending = asyncio.get_running_loop().create_future()
+            _pending[key] = pending
+            is_owner = True
+        else:
+            is_owner = False
+
+    # Another request is already running this query - wait for its result
+    if not is_owner:
+        return await asyncio.shield(pending)
+
+    # Format the query for the agent
+    query = f"Get me the recent developmental news for {place}"
+
+    try:
+        # Get response from the agent team
+        async with _team_semaphore:
+            run_response = await ghana_dev_news_team.arun(query)
+        response = run_response.content if hasattr(run_response, "content") else str(run_response)
+        pending.set_result(response)
+    except BaseException as e:
+        # BaseException so waiters are released even if this request is
+        # cancelled mid-run (client disconnect); give them a retryable error
+        # instead of propagating the cancellation as their own
+        if isinstance(e, asyncio.CancelledError):
+            pending.set_exception(
+                HTTPException(status_code=503, detail="News request was cancelled, please retry")
+            )
+        else:
+            pending.set_exception(e)
+        pending.exception()  # mark retrieved in case no waiter ever awaits it
+        raise
+    finally:
+        async with _cache_lock:
+            del _pending[key]
+
+    async with _cache_lock:
+        _cache[key] = (time.monotonic(), response)
+        while len(_cache) > CACHE_MAX_ENTRIES:
+            _cache.popitem(last=False)
+
+    return response
+
+@app.on_event("startup")
+async def startup_build_team():
+    """Build the agent team per worker once the event loop is running"""
+    global ghana_dev_news_team
+    ghana_dev_news_team = get_team(verbose=False)
+
 @app.get("/")
 async def root():
     return {"message": "Welcome to TropiTrek Ghana Development News API"}
 
 @app.post("/news", response_model=NewsResponse)
 async def get_news(request: PlaceRequest):
-    if not request.place:
+    if not request.place.strip():
         raise HTTPException(status_code=400, detail="Place name is required")
-    
-    # Format the query for the agent
+
+    return NewsResponse(news=await _fetch_news(request.place))
+
+@app.post("/news/stream")
+async def get_news_stream(request: PlaceRequest):
+    if not request.place.strip():
+        raise HTTPException(status_code=400, detail="Place name is required")
+
     query = f"Get me the recent developmental news for {request.place}"
-    
-    # Get response from the agent team
-    # response = ghana_dev_news_team.print_response(
-    #     query,
-    #     stream=False,
-    #     show_full_reasoning=False,
-    #     stream_intermediate_steps=False,
-    # )
-    run_response = await ghana_dev_news_team.arun(query)
-    response = run_response.content if hasattr(run_response, "content") else str(run_response)
-    return NewsResponse(news=response)
-    # return NewsResponse(news=response)
+
+    # Stream the team response as SSE so the first tokens reach the client
+    # in well under a second instead of after the whole run completes.
+    # Streamed runs bypass the response cache - /news stays the buffered path.
+    async def event_gen():
+        try:
+            async for chunk in await ghana_dev_news_team.arun(
+                query, stream=True, stream_intermediate_steps=False
+            ):
+                if getattr(chunk, "content", None):
+                    yield f"data: {json.dumps({'delta': chunk.content})}\n\n"
+        except Exception as e:
+            # Headers are already sent; surface the failure as an SSE event
+            # instead of tearing down the stream mid-flight
+            yield f"data: {json.dumps({'error': str(e)})}\n\n"
+            return
+        yield "data: [DONE]\n\n"
+
+    return StreamingResponse(event_gen(), media_type="text/event-stream")
+
+@app.post("/news/batch", response_model=BatchNewsResponse)
+async def get_news_batch(request: BatchPlaceRequest):
+    places = [p for p in request.places if p.strip()]
+    if not places:
+        raise HTTPException(status_code=400, detail="At least one place name is required")
+    if len(places) > BATCH_MAX_PLACES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {BATCH_MAX_PLACES} places per batch request",
+        )
+
+    # De-duplicate on the normalized key and fan out concurrently; the
+    # single-flight map in _fetch_news coalesces overlap with /news too
+    unique: Dict[str, str] = {}
+    for place in places:
+        unique.setdefault(place.strip().casefold(), place)
+
+    results = await asyncio.gather(
+        *(_fetch_news(place) for place in unique.values()),
+        return_exceptions=True,
+    )
+
+    by_key: Dict[str, str] = {}
+    for key, result in zip(unique, results):
+        if isinstance(result, BaseException):
+            by_key[key] = f"Error: {result}"
+        else:
+            by_key[key] = result
+
+    return BatchNewsResponse(news={place: by_key[place.strip().casefold()] for place in places})
 
 if __name__ == "__main__":
-    uvicorn.run("api:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
+    # Multi-worker uvloop/httptools serving; the response cache and
+    # single-flight map are per-process, so each worker warms its own
+    uvicorn.run(
+        "api:app",
+        host="0.0.0.0",
+        port=8000,
+        workers=int(os.getenv("WEB_CONCURRENCY", "4")),
+        loop="uvloop",
+        http="httptools",
+        log_level="info",
+    )
\ No newline at end of file
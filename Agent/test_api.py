@@ -1,26 +1,45 @@
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
 
-def test_news_api(place):
-    """Test the news API with a specific place"""
+# Shared session so repeated calls reuse one TCP connection (keep-alive)
+# instead of paying the handshake cost on every request
+SESSION = requests.Session()
+SESSION.headers.update({"Connection": "keep-alive", "Content-Type": "application/json"})
+SESSION.mount(
+    "http://",
+    HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=16,
+        max_retries=Retry(total=2, backoff_factor=0.2),
+    ),
+)
+
+def test_news_api(places):
+    """Test the news API with one place or a list of places"""
     url = "http://localhost:8000/news"
-    payload = {"place": place}
-    headers = {"Content-Type": "application/json"}
-    
-    try:
-        response = requests.post(url, json=payload, headers=headers)
-        response.raise_for_status()  # Raise an exception for 4XX/5XX responses
-        
-        # Print the response
-        print(f"\nDevelopmental News for {place}:\n")
-        result = response.json()
-        print(result["news"])
-        return True
-    except requests.exceptions.RequestException as e:
-        print(f"Error: {e}")
-        return False
+    if isinstance(places, str):
+        places = [places]
+
+    success = True
+    for place in places:
+        payload = {"place": place}
+        try:
+            response = SESSION.post(url, json=payload, timeout=(3, 60))
+            response.raise_for_status()  # Raise an exception for 4XX/5XX responses
+
+            # Print the response
+            print(f"\nDevelopmental News for {place}:\n")
+            result = response.json()
+            print(result["news"])
+        except requests.exceptions.RequestException as e:
+            print(f"Error: {e}")
+            success = False
+    return success
 
 if __name__ == "__main__":
     # Make sure the API server is running before executing this script
-    place = input("Enter a place in Ghana to get developmental news for: ")
-    test_news_api(place)
\ No newline at end of file
+    # Comma-separated input reuses the same pooled connection for every place
+    places = input("Enter one or more places in Ghana (comma-separated): ")
+    test_news_api([p.strip() for p in places.split(",") if p.strip()])
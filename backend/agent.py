@@ -1,7 +1,7 @@
 from agno.agent import Agent
 from agno.tools.duckduckgo import DuckDuckGoTools
-from agno.models.openai import OpenAIChat
 from tools import TropicTrekToolkit
+from config import MODEL
 import asyncio
 from agno.memory.v2.db.sqlite import SqliteMemoryDb
 from agno.memory.v2.memory import Memory
@@ -48,40 +48,54 @@ SYSTEM_PROMPT = (
     "Always speak as if you are inviting them into your home island, with pride, warmth, and a little sprinkle of local flavor."
 )
 
-# Create OpenRouter model
-openrouter_model = OpenAIChat(
-    id="google/gemini-2.5-flash",
-    api_key=os.getenv('OPENROUTER_API_KEY'),
-    base_url="https://openrouter.ai/api/v1",
-    extra_headers={
-        "HTTP-Referer": os.getenv('SITE_URL', 'https://tropictrek.com'),
-        "X-Title": os.getenv('SITE_NAME', 'TropicTrek'),
-    }
-)
+# Shared OpenRouter model from config (one HTTPX pool for all agents)
+openrouter_model = MODEL
 
-agent = Agent(
-    model=openrouter_model,
-    tools=[tropictrek_toolkit, DuckDuckGoTools(), searxng],
-    instructions=(
-        "You are TropicTrek, a specialized tourism assistant for Eastern Caribbean Currency Union (ECCU) countries. "
-        "Use DuckDuckGo search to find current information about ECCU destinations, attractions, and activities. "
-        "When users want to see images of destinations, beaches, attractions, or places, use the search_destination_images tool to show beautiful photos from Unsplash. "
-        "You can also try SearxNG for additional images if needed, but search_destination_images is your primary image tool. "
-        "When users want a complete travel itinerary, use the create_itinerary_with_pdf tool to generate personalized itineraries with downloadable PDFs. "
-        "Be enthusiastic about Caribbean culture and always ask for the traveler's name to personalize itineraries. "
-        "Collect: traveler name, destination, travel style, trip duration, interests, and budget level for itinerary creation. "
-        "Use the voice_speak tool when the user asks you to speak or when voice output is appropriate. "
-        "Use the voice_listen tool when the user activates voice input mode."
-    ),
-    system_message=SYSTEM_PROMPT,
-    markdown=True,
-    show_tool_calls=True,
-    debug_mode=True,
-    enable_agentic_memory=True,
-    add_history_to_messages=True,
-    num_history_runs=3
+INSTRUCTIONS = (
+    "You are TropicTrek, a specialized tourism assistant for Eastern Caribbean Currency Union (ECCU) countries. "
+    "Use DuckDuckGo search to find current information about ECCU destinations, attractions, and activities. "
+    "When users want to see images of destinations, beaches, attractions, or places, use the search_destination_images tool to show beautiful photos from Unsplash. "
+    "You can also try SearxNG for additional images if needed, but search_destination_images is your primary image tool. "
+    "When users want a complete travel itinerary, use the create_itinerary_with_pdf tool to generate personalized itineraries with downloadable PDFs. "
+    "Be enthusiastic about Caribbean culture and always ask for the traveler's name to personalize itineraries. "
+    "Collect: traveler name, destination, travel style, trip duration, interests, and budget level for itinerary creation. "
+    "Use the voice_speak tool when the user asks you to speak or when voice output is appropriate. "
+    "Use the voice_listen tool when the user activates voice input mode."
 )
 
+def build_cli_agent() -> Agent:
+    """Interactive agent with agentic memory and conversation history"""
+    return Agent(
+        model=openrouter_model,
+        tools=[tropictrek_toolkit, DuckDuckGoTools(), searxng],
+        instructions=INSTRUCTIONS,
+        system_message=SYSTEM_PROMPT,
+        markdown=True,
+        show_tool_calls=True,
+        debug_mode=True,
+        enable_agentic_memory=True,
+        add_history_to_messages=True,
+        num_history_runs=3
+    )
+
+def build_api_agent() -> Agent:
+    """Fast-path agent for API serving: no agentic memory writes and no
+    history reload per request, so each call costs only the model turn"""
+    return Agent(
+        model=openrouter_model,
+        tools=[tropictrek_toolkit, DuckDuckGoTools(), searxng],
+        instructions=INSTRUCTIONS,
+        system_message=SYSTEM_PROMPT,
+        markdown=False,
+        show_tool_calls=False,
+        debug_mode=False,
+        enable_agentic_memory=False,
+        add_history_to_messages=False,
+        num_history_runs=0
+    )
+
+agent = build_cli_agent()
+
 async def main():
     """Main conversation loop with voice mode support"""
     print("🌴 Welcome to TropicTrek! 🌴")
@@ -0,0 +1,34 @@
+import os
+import httpx
+from agno.models.openai import OpenAIChat
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# All keys come from the environment (.env locally); nothing is hard-coded
+OPENROUTER_API_KEY = os.getenv('OPENROUTER_API_KEY')
+OPENWEATHER_API_KEY = os.getenv('OPENWEATHER_API_KEY')
+UNSPLASH_ACCESS_KEY = os.getenv('UNSPLASH_ACCESS_KEY')
+YOUTUBE_API_KEY = os.getenv('YOUTUBE_API_KEY')
+SUPABASE_DB_URL = os.getenv('SUPABASE_DB_URL')
+
+SITE_URL = os.getenv('SITE_URL', 'https://tropictrek.com')
+SITE_NAME = os.getenv('SITE_NAME', 'TropicTrek')
+
+# One async client shared by every agent's model so all OpenRouter calls
+# multiplex over a single keep-alive connection pool
+OPENROUTER_HTTP_CLIENT = httpx.AsyncClient(
+    limits=httpx.Limits(max_keepalive_connections=32, max_connections=64),
+)
+
+# Single OpenRouter-backed model instance shared by the API and CLI agents
+MODEL = OpenAIChat(
+    id="google/gemini-2.5-flash",
+    api_key=OPENROUTER_API_KEY,
+    base_url="https://openrouter.ai/api/v1",
+    http_client=OPENROUTER_HTTP_CLIENT,
+    extra_headers={
+        "HTTP-Referer": SITE_URL,
+        "X-Title": SITE_NAME,
+    },
+)
@@ -2,9 +2,17 @@ from typing import List, Optional
 from agno.agent import Agent
 from agno.tools import Toolkit
 from agno.utils.log import logger
-from openai import OpenAI
+from openai import AsyncOpenAI
+import asyncio
+import hashlib
+import io
+import json
 import os
-import requests
+import re
+import secrets
+from collections import OrderedDict, deque
+import httpx
+import orjson
 from dotenv import load_dotenv
 from reportlab.lib.pagesizes import letter, A4
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, PageBreak
@@ -12,44 +20,484 @@ from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 from reportlab.lib.colors import HexColor
 import datetime
+import time
 
 load_dotenv()
 
+# One async OpenRouter client per process so every toolkit instance shares
+# the underlying httpx connection pool, and LLM calls never block the loop
+_OPENROUTER_CLIENT = AsyncOpenAI(
+    base_url="https://openrouter.ai/api/v1",
+    api_key=os.getenv('OPENROUTER_API_KEY'),
+)
+
+# Shared async HTTP client so repeated weather lookups reuse pooled
+# keep-alive connections instead of opening a new one per call
+WX_CLIENT = httpx.AsyncClient(
+    timeout=10.0,
+    limits=httpx.Limits(max_keepalive_connections=10, max_connections=20),
+)
+
+async def close_http_clients():
+    """Close the shared HTTP client pool (call on app shutdown)"""
+    await WX_CLIENT.aclose()
+
+# Keep OpenWeather traffic under the free-tier limit: at most 10 calls in
+# flight and 60 per rolling minute, with backoff retries on 429/5xx
+_OW_SEM = asyncio.Semaphore(10)
+_OW_MAX_PER_MINUTE = 60
+_ow_call_times: "deque[float]" = deque()
+_ow_window_lock = asyncio.Lock()
+
+async def _ow_throttle():
+    while True:
+        async with _ow_window_lock:
+            now = time.monotonic()
+            while _ow_call_times and now - _ow_call_times[0] >= 60:
+                _ow_call_times.popleft()
+            if len(_ow_call_times) < _OW_MAX_PER_MINUTE:
+                _ow_call_times.append(now)
+                return
+            wait = 60 - (now - _ow_call_times[0])
+        await asyncio.sleep(wait)
+
+async def _ow_get(url: str) -> httpx.Response:
+    """GET an OpenWeather URL under the concurrency/rate limits, retrying
+    429s and 5xxs with backoff (honouring Retry-After when present)"""
+    backoff = 0.5
+    for attempt in range(3):
+        await _ow_throttle()
+        async with _OW_SEM:
+            response = await WX_CLIENT.get(url)
+        if response.status_code == 429 or response.status_code >= 500:
+            if attempt == 2:
+                return response
+            retry_after = response.headers.get("Retry-After")
+            delay = float(retry_after) if retry_after and retry_after.isdigit() else backoff
+            await asyncio.sleep(delay)
+            backoff *= 2
+            continue
+        return response
+    return response
+
+# Canonical ECCU location names keyed by every spelling variant we expect
+# from users and the model; one precomputed dict lookup replaces repeated
+# per-call normalization and keeps cache keys consistent across spellings
+_LOCATION_ALIASES = {
+    "anguilla": "Anguilla",
+    "antigua": "Antigua",
+    "antigua & barbuda": "Antigua",
+    "antigua and barbuda": "Antigua",
+    "barbuda": "Barbuda",
+    "dominica": "Dominica",
+    "roseau": "Roseau",
+    "grenada": "Grenada",
+    "montserrat": "Montserrat",
+    "st kitts": "Saint Kitts",
+    "st. kitts": "Saint Kitts",
+    "saint kitts": "Saint Kitts",
+    "st kitts & nevis": "Saint Kitts",
+    "st kitts and nevis": "Saint Kitts",
+    "nevis": "Nevis",
+    "st lucia": "Saint Lucia",
+    "st. lucia": "Saint Lucia",
+    "saint lucia": "Saint Lucia",
+    "castries": "Castries",
+    "st vincent": "Saint Vincent",
+    "st. vincent": "Saint Vincent",
+    "saint vincent": "Saint Vincent",
+    "st vincent & the grenadines": "Saint Vincent",
+    "st vincent and the grenadines": "Saint Vincent",
+    "kingstown": "Kingstown",
+}
+
+def _canonical_location(location: str) -> str:
+    """Map a user/model spelling to its canonical ECCU name (pass-through
+    for locations outside the table)"""
+    return _LOCATION_ALIASES.get(location.strip().casefold(), location.strip())
+
+# Island coordinates never change; querying OpenWeather by lat/lon skips
+# its internal geocoding step and never misses on name ambiguity
+_ISLAND_COORDS = {
+    "anguilla": (18.2206, -63.0686),
+    "antigua": (17.1274, -61.8468),
+    "barbuda": (17.6266, -61.7713),
+    "dominica": (15.4150, -61.3710),
+    "roseau": (15.3010, -61.3870),
+    "grenada": (12.1165, -61.6790),
+    "montserrat": (16.7425, -62.1874),
+    "saint kitts": (17.3578, -62.7830),
+    "nevis": (17.1554, -62.5796),
+    "saint lucia": (13.9094, -60.9789),
+    "castries": (14.0101, -60.9875),
+    "saint vincent": (13.2528, -61.1971),
+    "kingstown": (13.1600, -61.2248),
+}
+
+def _wx_query(location: str) -> str:
+    """Query-string fragment for a location: lat/lon for known islands,
+    name lookup otherwise"""
+    coords = _ISLAND_COORDS.get(location.casefold())
+    if coords:
+        return f"lat={coords[0]}&lon={coords[1]}"
+    return f"q={location}"
+
+# LLM itinerary content repeats across users for the same (destination,
+# style, days, interests, budget) tuple; cache it for a week and personalize
+# only the traveler-name line so a cache hit skips the whole completion
+ITIN_CACHE_TTL = 7 * 86400  # seconds
+ITIN_CACHE_MAX_ENTRIES = 512
+_itinerary_cache: "OrderedDict[str, tuple[float, str]]" = OrderedDict()
+# In-flight generations per cache key: a burst of identical requests rides
+# one LLM call instead of each firing its own
+_itinerary_pending: dict = {}
+
+# Filler words that don't change what an itinerary covers; stripping them
+# (plus naive de-pluralization and token sorting) folds paraphrased interest
+# strings like "beaches and hiking" / "hiking, beach" onto one cache key
+_INTEREST_STOPWORDS = frozenset({
+    "a", "an", "and", "for", "in", "lots", "of", "on", "or", "some", "the", "to", "with",
+})
+
+def _depluralize(token: str) -> str:
+    if token.endswith("es"):
+        return token[:-2]
+    if token.endswith("s"):
+        return token[:-1]
+    return token
+
+def _normalize_interests(interests: str) -> str:
+    tokens = re.findall(r"[a-z]+", interests.casefold())
+    keywords = {_depluralize(t) for t in tokens if t not in _INTEREST_STOPWORDS}
+    return " ".join(sorted(keywords))
+
+# Unsplash results for a query barely change within the hour; caching the
+# rendered response saves the HTTP round trip and API quota on repeats
+UNSPLASH_CACHE_TTL = 3600  # seconds
+UNSPLASH_CACHE_MAX_ENTRIES = 1024
+_unsplash_cache: "OrderedDict[tuple, tuple[float, str]]" = OrderedDict()
+
+# Weather responses barely change within minutes; cache per (location, date)
+# so repeated tool calls in a conversation skip the OpenWeather round-trip.
+# Bounded like the other caches: location strings come from the model, so
+# distinct keys would otherwise accumulate for the life of the worker.
+WX_CACHE_TTL_CURRENT = 900   # seconds, current conditions
+WX_CACHE_TTL_FORECAST = 3600  # seconds, dated forecasts
+WX_CACHE_MAX_ENTRIES = 512
+_wx_cache: "OrderedDict[tuple, tuple[float, dict]]" = OrderedDict()
+# In-flight fetches per cache key, so concurrent misses for the same
+# location coalesce into one OpenWeather call instead of a thundering herd
+_wx_pending: dict = {}
+
+# Caribbean-flavored advice keyed by OpenWeather condition group (id // 100);
+# a dict lookup replaces a branchy if/elif chain on the tool hot path.
+# Condition codes: https://openweathermap.org/weather-conditions
+_WEATHER_SPECIALS = {
+    2: "⚡ Thunderstorms about - stay ashore and keep an eye on the sea conditions.",
+    3: "🌧️ Light showers passing through - a rainbow often follows, carry a light jacket.",
+    5: "☔ Rainy vibes today - perfect for a museum stop or a Creole cooking class indoors.",
+    6: "❄️ Unusually cool breezes - rare for the islands, bring a warm layer.",
+    7: "🌫️ Misty magic over the hills - take care on mountain roads and trails.",
+    8: "☁️ Partly cloudy - comfortable for hiking and exploring town.",
+}
+_WEATHER_SPECIAL_CLEAR = "☀️ Sun blazing sweet - perfect for a sea dip, pack reef-safe sunscreen."
+
+def _special_for(weather_id: int) -> str:
+    if weather_id == 800:
+        return _WEATHER_SPECIAL_CLEAR
+    return _WEATHER_SPECIALS.get(weather_id // 100, _WEATHER_SPECIALS[8])
+
+# The cache holds structured dicts; formatting happens lazily on return so
+# cached entries stay presentation-independent
+_CURRENT_TEMPLATE = (
+    "Weather in {location}: {desc}, {temp}°C (feels like {feels_like}°C), "
+    "humidity {humidity}%, wind speed {wind_speed} m/s. {special}"
+)
+_FORECAST_TEMPLATE = (
+    "Forecast for {location} on {date}: {desc}, {temp_min:.0f}-{temp_max:.0f}°C, "
+    "humidity {humidity}%, wind speed {wind_speed} m/s. {special}"
+)
+
+# Itinerary prompt templates, built once and stripped of the stray
+# leading/trailing whitespace that would otherwise be tokenized and billed
+# on every generation
+_ITINERARY_SYSTEM_TEMPLATE = """
+You are an expert travel planner specializing in creating simple, tabular travel itineraries for Caribbean destinations.
+
+Create itineraries in a clean, structured format that will be converted to professional PDF tables.
+
+Use this exact structure for the itinerary content:
+
+TRAVELER INFORMATION
+Name: {traveler_name}
+Destination: {destination}
+Duration: {days} days
+Travel Style: {travel_style}
+Budget: {budget}
+Generated: {current_date}
+
+ITINERARY SCHEDULE
+Day 1 - [Theme/Focus]
+Morning (9:00 AM) | Activity 1 | Location/Details
+Afternoon (2:00 PM) | Activity 2 | Location/Details
+Evening (6:00 PM) | Activity 3 | Location/Details
+
+Day 2 - [Theme/Focus]
+Morning (8:00 AM) | Activity 1 | Location/Details
+Afternoon (1:00 PM) | Activity 2 | Location/Details
+Evening (5:00 PM) | Activity 3 | Location/Details
+
+IMPORTANT INFORMATION
+Currency | Eastern Caribbean Dollar (XCD)
+Emergency | Local emergency number
+Weather | Current conditions and tips
+Local Tips | Cultural customs and advice
+
+Keep activities concise and specific. Focus on actual locations, restaurants, and attractions. Each activity should be one clear, actionable item.
+""".strip()
+
+_ITINERARY_USER_TEMPLATE = """
+Create a detailed {days}-day travel itinerary for {traveler_name} visiting {destination}.
+
+Traveler Details:
+- Name: {traveler_name}
+- Travel Style: {travel_style}
+- Budget Level: {budget}
+- Special Interests: {interests}
+- Trip Duration: {days} days
+""".strip()
+
+# Sidecar metadata for generated PDFs, keyed by filename; the filename
+# itself stays an opaque random id. Bounded so long-running workers don't
+# accumulate one record per PDF forever.
+PDF_METADATA_MAX_ENTRIES = 10000
+_pdf_metadata: "OrderedDict[str, dict]" = OrderedDict()
+
+# Emoji and dingbats make reportlab fall back to per-glyph CID lookups and
+# render as tofu in Helvetica; strip them from PDF text before layout
+_PDF_EMOJI_RE = re.compile(r"[\U0001F000-\U0001FAFF☀-➿️]")
+
+# Precompiled classifiers for the itinerary-content parser in _create_pdf
+_SECTION_HEADERS = {
+    "TRAVELER INFORMATION": "traveler",
+    "ITINERARY SCHEDULE": "schedule",
+    "IMPORTANT INFORMATION": "important",
+}
+_DAY_HEADER_RE = re.compile(r"^Day .* - ")
+_SCHEDULE_ROW_RE = re.compile(r"^([^|]+)\|([^|]+)\|(.+)$")
+
+def format_weather_summary(result: dict) -> str:
+    """Render a structured weather dict into the agent-facing summary line"""
+    template = _FORECAST_TEMPLATE if "date" in result else _CURRENT_TEMPLATE
+    return template.format(**result, special=_special_for(result["weather_id"]))
+
 class TropicTrekToolkit(Toolkit):
     def __init__(self, **kwargs):
         super().__init__(
             name="tropictrek_toolkit",
             tools=[
                 self.create_itinerary_with_pdf,
+                self.create_itinerary_with_images,
                 self.search_destination_images,
                 self.get_ecbb_weather,
+                self.get_ecbb_weather_bulk,
                 self.search_destination_videos
             ],
             **kwargs
         )
-        self.client = OpenAI(
-            base_url="https://openrouter.ai/api/v1",
-            api_key=os.getenv('OPENROUTER_API_KEY'),
-        )
+        self.client = _OPENROUTER_CLIENT
         self.unsplash_access_key = os.getenv('UNSPLASH_ACCESS_KEY')
         self.openweather_api_key = os.getenv('OPENWEATHER_API_KEY')
         self.youtube_api_key = os.getenv('YOUTUBE_API_KEY')
 
+        # PDF styles are invariant across documents; build them once here
+        # instead of re-parsing the sample stylesheet per _create_pdf call
+        self._styles = getSampleStyleSheet()
+        self._title_style = ParagraphStyle(
+            'CustomTitle',
+            parent=self._styles['Heading1'],
+            fontSize=20,
+            spaceAfter=20,
+            textColor=HexColor('#1E3A8A'),
+            alignment=1,
+            fontName='Helvetica-Bold'
+        )
+        self._day_header_style = ParagraphStyle(
+            'DayHeader',
+            parent=self._styles['Normal'],
+            fontSize=11,
+            fontName='Helvetica-Bold',
+            textColor=HexColor('#FFFFFF'),
+            alignment=1
+        )
+        self._time_style = ParagraphStyle(
+            'TimeStyle',
+            parent=self._styles['Normal'],
+            fontSize=9,
+            fontName='Helvetica-Bold',
+            leading=11,
+            leftIndent=3,
+            rightIndent=3,
+            wordWrap='CJK'
+        )
+        self._activity_style = ParagraphStyle(
+            'ActivityStyle',
+            parent=self._styles['Normal'],
+            fontSize=9,
+            fontName='Helvetica',
+            leading=11,
+            leftIndent=3,
+            rightIndent=3,
+            wordWrap='CJK'
+        )
+        self._location_style = ParagraphStyle(
+            'LocationStyle',
+            parent=self._styles['Normal'],
+            fontSize=9,
+            fontName='Helvetica',
+            leading=11,
+            leftIndent=3,
+            rightIndent=3,
+            wordWrap='CJK'
+        )
+        self._info_style = ParagraphStyle(
+            'InfoStyle',
+            parent=self._styles['Normal'],
+            fontSize=10,
+            fontName='Helvetica',
+            leading=12,
+            leftIndent=3,
+            rightIndent=3,
+            wordWrap='CJK'
+        )
+        self._key_style = ParagraphStyle(
+            'KeyStyle',
+            parent=self._styles['Normal'],
+            fontSize=10,
+            fontName='Helvetica-Bold',
+            leading=12,
+            leftIndent=3,
+            rightIndent=3
+        )
+        self._footer_style = ParagraphStyle(
+            'Footer',
+            parent=self._styles['Normal'],
+            fontSize=10,
+            textColor=HexColor('#6B7280'),
+            alignment=1
+        )
+        # reportlab allows reusing the same flowable across story lists
+        self._footer_paragraph = Paragraph(
+            "Generated by TropicTrek - Your AI Caribbean Travel Assistant", self._footer_style
+        )
+
     async def get_ecbb_weather(self, location: str, target_date: str = None) -> str:
         try:
-            url = f"http://api.openweathermap.org/data/2.5/weather?q={location}&appid={self.openweather_api_key}&units=metric"
-            response = requests.get(url, timeout=10)
-            if response.status_code != 200:
-                return f"Unable to fetch weather for {location}."
-            data = response.json()
-            weather_desc = data['weather'][0]['description']
-            temp = data['main']['temp']
-            feels_like = data['main']['feels_like']
-            humidity = data['main']['humidity']
-            wind_speed = data['wind']['speed']
-            return f"Weather in {location}: {weather_desc}, {temp}°C (feels like {feels_like}°C), humidity {humidity}%, wind speed {wind_speed} m/s."
+            result = await self._get_weather_data(location, target_date)
         except Exception as e:
             return f"Error fetching weather: {str(e)}"
+        if isinstance(result, str):
+            return result  # error message, not weather data
+        return format_weather_summary(result)
+
+    async def get_ecbb_weather_bulk(self, locations: List[str], target_date: str = None) -> str:
+        """Fetch weather for several islands at once; lookups run
+        concurrently, so N islands cost one round-trip, not N"""
+        results = await asyncio.gather(
+            *(self.get_ecbb_weather(location, target_date) for location in locations),
+            return_exceptions=True,
+        )
+        lines = []
+        for location, result in zip(locations, results):
+            if isinstance(result, BaseException):
+                lines.append(f"Error fetching weather for {location}: {result}")
+            else:
+                lines.append(result)
+        return "\n".join(lines)
+
+    async def _get_weather_data(self, location: str, target_date: str = None):
+        """Fetch structured weather fields, served from the TTL cache when
+        fresh; returns a plain message string when nothing can be fetched"""
+        location = _canonical_location(location)
+        cache_key = (location.casefold(), target_date or "")
+        ttl = WX_CACHE_TTL_FORECAST if target_date else WX_CACHE_TTL_CURRENT
+        cached = _wx_cache.get(cache_key)
+        if cached is not None:
+            fetched_at, result = cached
+            if time.monotonic() - fetched_at < ttl:
+                _wx_cache.move_to_end(cache_key)
+                return result
+            del _wx_cache[cache_key]
+
+        pending = _wx_pending.get(cache_key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+        pending = asyncio.get_running_loop().create_future()
+        _wx_pending[cache_key] = pending
+        try:
+            if target_date:
+                result = await self._fetch_forecast_data(location, target_date)
+            else:
+                result = await self._fetch_current_data(location)
+            if isinstance(result, dict):
+                _wx_cache[cache_key] = (time.monotonic(), result)
+                while len(_wx_cache) > WX_CACHE_MAX_ENTRIES:
+                    _wx_cache.popitem(last=False)
+            pending.set_result(result)
+        except BaseException as e:
+            pending.set_exception(e)
+            pending.exception()  # mark retrieved in case no waiter awaits it
+            raise
+        finally:
+            del _wx_pending[cache_key]
+        return result
+
+    async def _fetch_current_data(self, location: str):
+        url = f"http://api.openweathermap.org/data/2.5/weather?{_wx_query(location)}&appid={self.openweather_api_key}&units=metric"
+        response = await _ow_get(url)
+        if response.status_code != 200:
+            return f"Unable to fetch weather for {location}."
+        data = orjson.loads(response.content)
+        return {
+            "location": location,
+            "desc": data['weather'][0]['description'],
+            "weather_id": data['weather'][0]['id'],
+            "temp": data['main']['temp'],
+            "feels_like": data['main']['feels_like'],
+            "humidity": data['main']['humidity'],
+            "wind_speed": data['wind']['speed'],
+        }
+
+    async def _fetch_forecast_data(self, location: str, target_date: str):
+        try:
+            target = datetime.date.fromisoformat(target_date)
+        except ValueError:
+            return f"Invalid date '{target_date}'. Please use the YYYY-MM-DD format."
+        url = f"http://api.openweathermap.org/data/2.5/forecast?{_wx_query(location)}&appid={self.openweather_api_key}&units=metric"
+        response = await _ow_get(url)
+        if response.status_code != 200:
+            return f"Unable to fetch the forecast for {location}."
+        data = orjson.loads(response.content)
+        # Filter the ~40 three-hourly entries with integer compares on the
+        # unix 'dt' field instead of strptime-parsing every 'dt_txt'
+        target_start = int(datetime.datetime.combine(target, datetime.time.min).timestamp())
+        target_end = target_start + 86400
+        entries = [x for x in data['list'] if target_start <= x['dt'] < target_end]
+        if not entries:
+            return f"No forecast available for {location} on {target_date} (only ~5 days ahead are covered)."
+        temps = [x['main']['temp'] for x in entries]
+        # Midday entry is the most representative for a day of sightseeing
+        midday = min(entries, key=lambda x: abs(x['dt'] - (target_start + 43200)))
+        return {
+            "location": location,
+            "date": target_date,
+            "desc": midday['weather'][0]['description'],
+            "weather_id": midday['weather'][0]['id'],
+            "temp_min": min(temps),
+            "temp_max": max(temps),
+            "humidity": midday['main']['humidity'],
+            "wind_speed": midday['wind']['speed'],
+        }
 
     async def create_itinerary_with_pdf(
         self, 
@@ -62,12 +510,20 @@ class TropicTrekToolkit(Toolkit):
     ) -> str:
         logger.info(f"Creating itinerary for {traveler_name} - {destination} ({days} days)")
         try:
-            weather_info = ""
+            # Weather and itinerary content are independent fetches; running
+            # them together costs max(T) instead of their sum
             if days <= 10:
-                weather_info = await self.get_ecbb_weather(destination)
-            itinerary_content = await self._generate_itinerary_content(
-                destination, traveler_name, travel_style, days, interests, budget
-            )
+                weather_info, itinerary_content = await asyncio.gather(
+                    self.get_ecbb_weather(destination),
+                    self._generate_itinerary_content(
+                        destination, traveler_name, travel_style, days, interests, budget
+                    ),
+                )
+            else:
+                weather_info = ""
+                itinerary_content = await self._generate_itinerary_content(
+                    destination, traveler_name, travel_style, days, interests, budget
+                )
             if weather_info:
                 itinerary_content = f"{weather_info}\n\n{itinerary_content}"
             # Generate current date for PDF
@@ -98,59 +554,181 @@ Your complete itinerary has been saved as a PDF! Click the link above to downloa
             logger.error(f"Error creating itinerary: {e}")
             return f"Sorry, I encountered an error while creating your itinerary: {str(e)}"
 
+    async def create_itinerary_with_images(
+        self,
+        destination: str,
+        traveler_name: str,
+        travel_style: str,
+        days: int = 3,
+        interests: str = "",
+        budget: str = "moderate"
+    ) -> str:
+        """Build the itinerary PDF and fetch destination images in one shot;
+        the two round-trips run concurrently, so the combined answer lands
+        in max(T_llm, T_unsplash) rather than their sum"""
+        itinerary, images = await asyncio.gather(
+            self.create_itinerary_with_pdf(
+                destination, traveler_name, travel_style, days, interests, budget
+            ),
+            self.search_destination_images(destination, count=3),
+        )
+        return f"{itinerary}\n\n{images}"
+
+    async def generate_itineraries_bulk(self, requests: List[dict]) -> List[str]:
+        """Generate many itineraries concurrently for bulk/offline flows
+        (e.g. nightly pre-generation), bounded so OpenRouter rate limits
+        hold. Each entry is a kwargs dict for create_itinerary_with_pdf.
+
+        OpenRouter has no OpenAI-style Batch API, so bulk work runs through
+        the online endpoint with capped parallelism instead.
+        """
+        semaphore = asyncio.Semaphore(4)
+
+        async def bounded(params: dict) -> str:
+            async with semaphore:
+                return await self.create_itinerary_with_pdf(**params)
+
+        results = await asyncio.gather(
+            *(bounded(params) for params in requests), return_exceptions=True
+        )
+        return [
+            f"Error generating itinerary: {result}" if isinstance(result, BaseException) else result
+            for result in results
+        ]
+
     async def _generate_itinerary_content(
-        self, destination: str, traveler_name: str, travel_style: str, 
+        self, destination: str, traveler_name: str, travel_style: str,
         days: int, interests: str, budget: str
     ) -> str:
-        # Generate current date for the prompt
-        current_date = datetime.datetime.now().strftime("%B %d, %Y")
-        
-        system_prompt = f"""
-You are an expert travel planner specializing in creating simple, tabular travel itineraries for Caribbean destinations.
+        # Content is generated for a placeholder traveler and cached on the
+        # normalized parameters; only the name line is personalized per user
+        cache_key = hashlib.blake2b(json.dumps({
+            "dest": _canonical_location(destination).casefold(),
+            "style": travel_style.strip().casefold(),
+            "days": days,
+            "interests": _normalize_interests(interests),
+            "budget": budget.strip().casefold(),
+        }, sort_keys=True).encode()).hexdigest()
 
-Create itineraries in a clean, structured format that will be converted to professional PDF tables.
+        cached = _itinerary_cache.get(cache_key)
+        if cached is not None:
+            generated_at, content = cached
+            if time.monotonic() - generated_at < ITIN_CACHE_TTL:
+                _itinerary_cache.move_to_end(cache_key)
+                return self._personalize_itinerary(content, traveler_name)
+            del _itinerary_cache[cache_key]
 
-Use this exact structure for the itinerary content:
+        pending = _itinerary_pending.get(cache_key)
+        if pending is not None:
+            return self._personalize_itinerary(await asyncio.shield(pending), traveler_name)
+        pending = asyncio.get_running_loop().create_future()
+        _itinerary_pending[cache_key] = pending
+        try:
+            if days > 5:
+                content = await self._generate_sharded_content(
+                    destination, "Traveler", travel_style, days, interests, budget
+                )
+            else:
+                content = await self._request_itinerary_content(
+                    destination, "Traveler", travel_style, days, interests, budget
+                )
+            pending.set_result(content)
+        except BaseException as e:
+            pending.set_exception(e)
+            pending.exception()  # mark retrieved in case no waiter awaits it
+            raise
+        finally:
+            del _itinerary_pending[cache_key]
 
-TRAVELER INFORMATION
-Name: {traveler_name}
-Destination: {destination.title()}
-Duration: {days} days
-Travel Style: {travel_style}
-Budget: {budget.title()}
-Generated: {current_date}
+        # Never pin failures or blank output for a week
+        if content.strip() and not content.startswith("Error generating"):
+            _itinerary_cache[cache_key] = (time.monotonic(), content)
+            while len(_itinerary_cache) > ITIN_CACHE_MAX_ENTRIES:
+                _itinerary_cache.popitem(last=False)
+        return self._personalize_itinerary(content, traveler_name)
 
-ITINERARY SCHEDULE
-Day 1 - [Theme/Focus]
-Morning (9:00 AM) | Activity 1 | Location/Details
-Afternoon (2:00 PM) | Activity 2 | Location/Details  
-Evening (6:00 PM) | Activity 3 | Location/Details
+    @staticmethod
+    def _personalize_itinerary(content: str, traveler_name: str) -> str:
+        # Callable replacement so backslashes in the name are inserted
+        # literally instead of being parsed as regex escapes
+        return re.sub(r"(?m)^Name:\s*Traveler\s*$", lambda _: f"Name: {traveler_name}", content)
 
-Day 2 - [Theme/Focus]
-Morning (8:00 AM) | Activity 1 | Location/Details
-Afternoon (1:00 PM) | Activity 2 | Location/Details
-Evening (5:00 PM) | Activity 3 | Location/Details
-
-IMPORTANT INFORMATION
-Currency | Eastern Caribbean Dollar (XCD)
-Emergency | Local emergency number
-Weather | Current conditions and tips
-Local Tips | Cultural customs and advice
+    async def _generate_sharded_content(
+        self, destination: str, traveler_name: str, travel_style: str,
+        days: int, interests: str, budget: str
+    ) -> str:
+        """Generate a long itinerary as concurrent two-day shards.
 
-Keep activities concise and specific. Focus on actual locations, restaurants, and attractions. Each activity should be one clear, actionable item.
+        Generation time scales with output tokens, so a 10-day itinerary in
+        one call costs ~5x a 2-day one; sharding brings wall time down to
+        roughly the slowest shard at a small coherence cost. The first
+        shard carries the TRAVELER INFORMATION header and the last one the
+        IMPORTANT INFORMATION footer, so the concatenation parses like a
+        single document.
         """
-        user_prompt = f"""
-Create a detailed {days}-day travel itinerary for {traveler_name} visiting {destination}.
+        spans = [(start, min(start + 1, days)) for start in range(1, days + 1, 2)]
+        semaphore = asyncio.Semaphore(4)
 
-Traveler Details:
-- Name: {traveler_name}
-- Travel Style: {travel_style}
-- Budget Level: {budget}
-- Special Interests: {interests if interests else "General travel experience"}
-- Trip Duration: {days} days
-        """
-        try:
-            completion = self.client.chat.completions.create(
+        async def shard(index: int, span: tuple) -> str:
+            async with semaphore:
+                return await self._request_itinerary_content(
+                    destination, traveler_name, travel_style, days, interests, budget,
+                    day_range=span,
+                    include_header=(index == 0),
+                    include_footer=(index == len(spans) - 1),
+                )
+
+        parts = await asyncio.gather(*(shard(i, span) for i, span in enumerate(spans)))
+        for part in parts:
+            if part.startswith("Error generating"):
+                return part
+        return "\n\n".join(parts)
+
+    async def _request_itinerary_content(
+        self, destination: str, traveler_name: str, travel_style: str,
+        days: int, interests: str, budget: str,
+        day_range: tuple = None, include_header: bool = True, include_footer: bool = True
+    ) -> str:
+        # Generate current date for the prompt
+        current_date = datetime.datetime.now().strftime("%B %d, %Y")
+
+        system_prompt = _ITINERARY_SYSTEM_TEMPLATE.format(
+            traveler_name=traveler_name,
+            destination=destination.title(),
+            days=days,
+            travel_style=travel_style,
+            budget=budget.title(),
+            current_date=current_date,
+        )
+        user_prompt = _ITINERARY_USER_TEMPLATE.format(
+            traveler_name=traveler_name,
+            destination=destination,
+            days=days,
+            travel_style=travel_style,
+            budget=budget,
+            interests=interests if interests else "General travel experience",
+        )
+        if day_range is not None:
+            first_day, last_day = day_range
+            sections = []
+            if include_header:
+                sections.append("the TRAVELER INFORMATION section")
+            sections.append(
+                f"the ITINERARY SCHEDULE lines for days {first_day} to {last_day} only "
+                f"(keep numbering them Day {first_day}, Day {first_day + 1}, ... within the full {days}-day trip)"
+            )
+            if include_footer:
+                sections.append("the IMPORTANT INFORMATION section")
+            user_prompt += (
+                f"\nThis request covers one slice of the trip. Output ONLY {', then '.join(sections)}, "
+                "in the established format, with no other sections and no repetition of earlier days."
+            )
+
+        async def consume_stream() -> str:
+            # Stream the completion and accumulate deltas as they arrive;
+            # the PDF's table layout needs whole sections, so overlapping
+            # work stops at line assembly rather than per-line rendering
+            stream = await self.client.chat.completions.create(
                 extra_headers={
                     "HTTP-Referer": os.getenv('SITE_URL', 'https://tropictrek.com'),
                     "X-Title": os.getenv('SITE_NAME', 'TropicTrek'),
@@ -159,45 +737,73 @@ Traveler Details:
                 messages=[
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": user_prompt}
-                ]
+                ],
+                stream=True,
             )
-            return completion.choices[0].message.content
+            parts = []
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    parts.append(chunk.choices[0].delta.content)
+            return "".join(parts)
+
+        try:
+            return await asyncio.wait_for(consume_stream(), timeout=60)
         except Exception as e:
             logger.error(f"Error generating itinerary content: {e}")
             return f"Error generating detailed itinerary: {str(e)}"
 
     async def _create_pdf(
         self, content: str, traveler_name: str, destination: str, days: int, travel_style: str, current_date: str
+    ) -> str:
+        # reportlab layout and stream compression are CPU-bound; run the
+        # whole build in a worker thread so the event loop keeps serving.
+        # Threads rather than a process pool: flowables don't pickle, and
+        # zlib releases the GIL during compression anyway.
+        return await asyncio.to_thread(
+            self._build_pdf_sync, content, traveler_name, destination, days, travel_style, current_date
+        )
+
+    def _build_pdf_sync(
+        self, content: str, traveler_name: str, destination: str, days: int, travel_style: str, current_date: str
     ) -> str:
         from reportlab.platypus import Table, TableStyle
         from reportlab.lib import colors
         
-        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"TropicTrek_Itinerary_{traveler_name.replace(' ', '_')}_{destination.replace(' ', '_')}_{timestamp}.pdf"
-        
-        # Create PDF document with margins
+        # Random id instead of user-derived text: no collisions between
+        # same-name travelers in the same second, nothing to sanitize, and
+        # the metadata lives in _pdf_metadata rather than the filename
+        pdf_id = secrets.token_hex(8)
+        filename = f"TropicTrek_Itinerary_{pdf_id}.pdf"
+        _pdf_metadata[filename] = {
+            "traveler": traveler_name,
+            "destination": destination,
+            "days": days,
+            "travel_style": travel_style,
+            "created": current_date,
+        }
+        while len(_pdf_metadata) > PDF_METADATA_MAX_ENTRIES:
+            _pdf_metadata.popitem(last=False)
+
+        # Emoji can't render in the built-in fonts and cost a glyph lookup
+        # each; drop them from the document text up front
+        content = _PDF_EMOJI_RE.sub("", content)
+
+        # Render into memory first; the file is then written in one shot
+        # instead of reportlab dribbling buffered writes to disk
+        buffer = io.BytesIO()
         doc = SimpleDocTemplate(
-            filename, 
+            buffer,
             pagesize=A4,
             rightMargin=50,
             leftMargin=50,
             topMargin=50,
-            bottomMargin=50
+            bottomMargin=50,
+            pageCompression=1
         )
-        styles = getSampleStyleSheet()
+        styles = self._styles
+        title_style = self._title_style
         story = []
         
-        # Professional title style
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=20,
-            spaceAfter=20,
-            textColor=HexColor('#1E3A8A'),
-            alignment=1,
-            fontName='Helvetica-Bold'
-        )
-        
         # Add logo if it exists
         logo_path = os.path.join("frontend1", "public", "logo.png")
         if os.path.exists(logo_path):
@@ -216,14 +822,15 @@ Traveler Details:
         story.append(Paragraph(f"{destination.title()}", title_style))
         story.append(Spacer(1, 20))
         
-        # Parse content to extract structured data
-        lines = content.split('\n')
-        traveler_info = {}
+        # Parse content to extract structured data. splitlines() avoids the
+        # trailing empty entry split('\n') allocates, and the compiled
+        # patterns classify day headers and table rows in one C-level match
+        # instead of chained startswith/split per line.
         schedule_data = []
         important_info = {}
         current_section = None
         current_day = None
-        
+
         # Default traveler info if not found in content
         traveler_info = {
             'Name': traveler_name,
@@ -232,78 +839,36 @@ Traveler Details:
             'Travel Style': travel_style,
             'Generated': current_date
         }
-        
-        for line in lines:
+
+        for line in content.splitlines():
             line = line.strip()
             if not line:
                 continue
-                
-            if line == "TRAVELER INFORMATION":
-                current_section = "traveler"
-                continue
-            elif line == "ITINERARY SCHEDULE":
-                current_section = "schedule"
-                continue
-            elif line == "IMPORTANT INFORMATION":
-                current_section = "important"
+
+            section = _SECTION_HEADERS.get(line)
+            if section is not None:
+                current_section = section
                 continue
-                
+
             if current_section == "traveler" and ":" in line:
                 key, value = line.split(":", 1)
                 traveler_info[key.strip()] = value.strip()
-                
+
             elif current_section == "schedule":
-                if line.startswith("Day ") and " - " in line:
+                if _DAY_HEADER_RE.match(line):
                     current_day = line
                     # Create day header as a Paragraph that spans all columns
-                    day_para = Paragraph(current_day, ParagraphStyle(
-                        'DayHeader',
-                        parent=styles['Normal'],
-                        fontSize=11,
-                        fontName='Helvetica-Bold',
-                        textColor=HexColor('#FFFFFF'),
-                        alignment=1
-                    ))
+                    day_para = Paragraph(current_day, self._day_header_style)
                     schedule_data.append([day_para, "", ""])
-                elif "|" in line and current_day:
-                    parts = line.split("|")
-                    if len(parts) >= 3:
-                        time = parts[0].strip()
-                        activity = parts[1].strip()
-                        location = parts[2].strip()
+                elif current_day:
+                    match = _SCHEDULE_ROW_RE.match(line)
+                    if match:
                         # Wrap long text in Paragraph objects for proper table cell handling
-                        time_para = Paragraph(time, ParagraphStyle(
-                            'TimeStyle',
-                            parent=styles['Normal'],
-                            fontSize=9,
-                            fontName='Helvetica-Bold',
-                            leading=11,
-                            leftIndent=3,
-                            rightIndent=3,
-                            wordWrap='CJK'
-                        ))
-                        activity_para = Paragraph(activity, ParagraphStyle(
-                            'ActivityStyle',
-                            parent=styles['Normal'],
-                            fontSize=9,
-                            fontName='Helvetica',
-                            leading=11,
-                            leftIndent=3,
-                            rightIndent=3,
-                            wordWrap='CJK'
-                        ))
-                        location_para = Paragraph(location, ParagraphStyle(
-                            'LocationStyle',
-                            parent=styles['Normal'],
-                            fontSize=9,
-                            fontName='Helvetica',
-                            leading=11,
-                            leftIndent=3,
-                            rightIndent=3,
-                            wordWrap='CJK'
-                        ))
+                        time_para = Paragraph(match.group(1).strip(), self._time_style)
+                        activity_para = Paragraph(match.group(2).strip(), self._activity_style)
+                        location_para = Paragraph(match.group(3).strip(), self._location_style)
                         schedule_data.append([time_para, activity_para, location_para])
-                        
+
             elif current_section == "important" and "|" in line:
                 key, value = line.split("|", 1)
                 important_info[key.strip()] = value.strip()
@@ -427,27 +992,8 @@ Traveler Details:
                 ['IMPORTANT INFORMATION', '']
             ]
             
-            # Create paragraph style for table content
-            info_style = ParagraphStyle(
-                'InfoStyle',
-                parent=styles['Normal'],
-                fontSize=10,
-                fontName='Helvetica',
-                leading=12,
-                leftIndent=3,
-                rightIndent=3,
-                wordWrap='CJK'
-            )
-            
-            key_style = ParagraphStyle(
-                'KeyStyle',
-                parent=styles['Normal'],
-                fontSize=10,
-                fontName='Helvetica-Bold',
-                leading=12,
-                leftIndent=3,
-                rightIndent=3
-            )
+            info_style = self._info_style
+            key_style = self._key_style
             
             for key, value in important_info.items():
                 # Wrap both key and value in Paragraph objects for proper text wrapping
@@ -479,17 +1025,14 @@ Traveler Details:
         
         # Footer
         story.append(Spacer(1, 40))
-        footer_style = ParagraphStyle(
-            'Footer',
-            parent=styles['Normal'],
-            fontSize=10,
-            textColor=HexColor('#6B7280'),
-            alignment=1
-        )
-        story.append(Paragraph("Generated by TropicTrek - Your AI Caribbean Travel Assistant", footer_style))
+        story.append(self._footer_paragraph)
         
         # Build PDF
         doc.build(story)
+
+        # One open+write+close for the whole document
+        with open(filename, "wb") as pdf_file:
+            pdf_file.write(buffer.getvalue())
         
         logger.info(f"Professional tabular PDF created: {filename}")
         return filename
@@ -500,6 +1043,17 @@ Traveler Details:
             return "🖼️ Image search is currently unavailable. Please configure the Unsplash API key."
         try:
             count = min(count, 10)
+
+            # Serve repeats of common queries from the hourly cache
+            cache_key = (query.strip().casefold(), count)
+            cached = _unsplash_cache.get(cache_key)
+            if cached is not None:
+                fetched_at, cached_response = cached
+                if time.monotonic() - fetched_at < UNSPLASH_CACHE_TTL:
+                    _unsplash_cache.move_to_end(cache_key)
+                    return cached_response
+                del _unsplash_cache[cache_key]
+
             url = "https://api.unsplash.com/search/photos"
             params = {
                 'query': query,
@@ -508,10 +1062,10 @@ Traveler Details:
                 'content_filter': 'high',
                 'client_id': self.unsplash_access_key
             }
-            response = requests.get(url, params=params, timeout=10)
+            response = await WX_CLIENT.get(url, params=params)
             if response.status_code != 200:
                 return f"🖼️ Sorry, I couldn't fetch images for '{query}' right now."
-            data = response.json()
+            data = orjson.loads(response.content)
             results = data.get('results', [])
             if not results:
                 return f"🖼️ No images found for '{query}'. Try a different search term like 'Caribbean beach' or 'tropical island'."
@@ -521,7 +1075,11 @@ Traveler Details:
             image_descriptions = []
             
             for i, image in enumerate(results[:count], 1):
-                image_url = image['urls']['regular']
+                # 'small' (400px via the imgix pipeline) matches the chat
+                # preview size; 'regular' ships ~4x the bytes for no
+                # visible gain at that width
+                urls = image['urls']
+                image_url = urls.get('small') or urls.get('regular')
                 alt_description = image.get('alt_description', query)
                 photographer = image['user']['name']
                 
@@ -544,13 +1102,17 @@ Traveler Details:
             
             logger.info(f"Successfully found {len(results)} images for query: {query}")
             logger.info(f"Returning image URLs to agent: {image_urls}")
+
+            _unsplash_cache[cache_key] = (time.monotonic(), response)
+            while len(_unsplash_cache) > UNSPLASH_CACHE_MAX_ENTRIES:
+                _unsplash_cache.popitem(last=False)
             return response
             
-        except requests.exceptions.Timeout:
+        except httpx.TimeoutException:
             logger.error(f"Timeout while searching for images: {query}")
             return f"🖼️ The image search timed out. Please try again with a simpler search term."
             
-        except requests.exceptions.RequestException as e:
+        except httpx.RequestError as e:
             logger.error(f"Request error while searching for images: {e}")
             return f"🖼️ There was a connection issue while searching for images. Please check your internet connection and try again."
             
@@ -580,13 +1142,13 @@ Traveler Details:
                 'key': self.youtube_api_key
             }
             
-            response = requests.get(url, params=params, timeout=10)
+            response = await WX_CLIENT.get(url, params=params)
             
             if response.status_code != 200:
                 logger.error(f"YouTube API error: {response.status_code} - {response.text}")
                 return f"🎥 Sorry, I couldn't fetch videos for '{query}' right now. Please try again later."
             
-            data = response.json()
+            data = orjson.loads(response.content)
             items = data.get('items', [])
             
             if not items:
@@ -642,11 +1204,11 @@ These videos will help you explore and visualize your destination before your tr
             logger.info(f"Returning embed URLs: {embed_urls}")
             return response_text
             
-        except requests.exceptions.Timeout:
+        except httpx.TimeoutException:
             logger.error(f"Timeout while searching for videos: {query}")
             return f"🎥 The video search timed out. Please try again with a simpler search term."
             
-        except requests.exceptions.RequestException as e:
+        except httpx.RequestError as e:
             logger.error(f"Request error while searching for videos: {e}")
             return f"🎥 There was a connection issue while searching for videos. Please check your internet connection and try again."
             